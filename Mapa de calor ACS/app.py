@@ -1,12 +1,13 @@
 # app.py — Painel de Visitas dos ACS (estável p/ Streamlit Cloud)
 import os
 from datetime import timedelta
-import numpy as np
 import pandas as pd
 import streamlit as st
 import folium
 from folium.plugins import HeatMap, HeatMapWithTime, LocateControl, Fullscreen, MousePosition
 from streamlit_folium import st_folium
+from features.map_view import haversine
+from features.route_metrics import render_route_metrics
 
 # =========================
 # ======= CONFIG ==========
@@ -42,7 +43,7 @@ def load_csv_visitas(path: str) -> pd.DataFrame:
         cl = c.strip().lower()
         if cl in ["data_visita", "data", "dt_visita", "dia", "date"]:
             rename_map[c] = "data_visita"
-        elif cl in ["hora", "horario", "time"]:
+        elif cl in ["hora", "hora_visita", "horario", "time"]:
             rename_map[c] = "hora"
         elif cl in ["latitude", "lat", "y"]:
             rename_map[c] = "latitude"
@@ -74,10 +75,10 @@ def load_csv_visitas(path: str) -> pd.DataFrame:
     df["latitude"]  = pd.to_numeric(df["latitude"], errors="coerce")
     df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
     if "hora" in df.columns:
-        try:
-            df["hora"] = pd.to_datetime(df["hora"], errors="coerce").dt.time
-        except Exception:
-            df["hora"] = pd.to_datetime(df["hora"], errors="coerce", format="%H:%M").dt.time
+        hora = pd.to_datetime(df["hora"], errors="coerce", format="%H:%M:%S")
+        hora = hora.fillna(pd.to_datetime(df["hora"], errors="coerce", format="%H:%M"))
+        df["hora_seg"] = (hora - hora.dt.normalize()).dt.total_seconds()
+        df["hora"] = hora.dt.time
 
     df = df.dropna(subset=["data_visita", "latitude", "longitude"]).copy()
 
@@ -247,14 +248,6 @@ if ret and ret.get("last_clicked") and not df_dia.empty:
     lat_c = ret["last_clicked"]["lat"]
     lon_c = ret["last_clicked"]["lng"]
 
-    def haversine(lat1, lon1, lat2, lon2):
-        R = 6371000.0
-        p1, p2 = np.radians(lat1), np.radians(lat2)
-        dphi = np.radians(lat2 - lat1)
-        dl   = np.radians(lon2 - lon1)
-        a = np.sin(dphi/2)**2 + np.cos(p1)*np.cos(p2)*np.sin(dl/2)**2
-        return 2*R*np.arcsin(np.sqrt(a))
-
     df_tmp = df_dia.copy()
     df_tmp["dist_m"] = haversine(lat_c, lon_c, df_tmp["latitude"].values, df_tmp["longitude"].values)
     nearest = df_tmp.sort_values("dist_m").head(1)
@@ -355,5 +348,10 @@ if not baixo.empty:
 else:
     st.success("Nenhum ACS com baixo volume no período.")
 
+# =========================
+# ======= ROTAS ===========
+# =========================
+render_route_metrics(visitas_periodo, periodo, tiles_claros)
+
 # ====== FIM ======
 
@@ -2,8 +2,10 @@ import json, os
 import pandas as pd
 import streamlit as st
 from dataclasses import dataclass
-from typing import Optional
-from .config import Settings
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:  # só para anotação: o loader não depende de pydantic-settings
+    from .config import Settings
 
 @st.cache_data(show_spinner=True)
 def load_visitas(csv_path: str) -> pd.DataFrame:
@@ -18,7 +20,7 @@ def load_visitas(csv_path: str) -> pd.DataFrame:
         cl = c.strip().lower()
         if cl in ["data_visita", "data", "dt_visita", "dia", "date"]:
             rename_map[c] = "data_visita"
-        elif cl in ["hora", "horario", "time"]:
+        elif cl in ["hora", "hora_visita", "horario", "time"]:
             rename_map[c] = "hora"
         elif cl in ["latitude", "lat", "y"]:
             rename_map[c] = "latitude"
@@ -50,10 +52,10 @@ def load_visitas(csv_path: str) -> pd.DataFrame:
     df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce")
     df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
     if "hora" in df.columns:
-        try:
-            df["hora"] = pd.to_datetime(df["hora"], errors="coerce").dt.time
-        except Exception:
-            df["hora"] = pd.to_datetime(df["hora"], format="%H:%M", errors="coerce").dt.time
+        hora = pd.to_datetime(df["hora"], format="%H:%M:%S", errors="coerce")
+        hora = hora.fillna(pd.to_datetime(df["hora"], format="%H:%M", errors="coerce"))
+        df["hora_seg"] = (hora - hora.dt.normalize()).dt.total_seconds()
+        df["hora"] = hora.dt.time
 
     df = df.dropna(subset=["data_visita", "latitude", "longitude"]).copy()
 
@@ -86,7 +88,7 @@ def _load_geojson(path: str):
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def load_geojson_layers(settings: Settings) -> Layers:
+def load_geojson_layers(settings: "Settings") -> Layers:
     return Layers(
         df=_load_geojson(settings.territorio_df),
         rs=_load_geojson(settings.regioes_saude),
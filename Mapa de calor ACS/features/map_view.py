@@ -7,6 +7,14 @@ from streamlit_folium import st_folium
 from typing import Dict
 from core.data import Layers
 
+def haversine(lat1, lon1, lat2, lon2):
+    R = 6371000.0
+    p1, p2 = np.radians(lat1), np.radians(lat2)
+    dphi = np.radians(lat2 - lat1)
+    dl   = np.radians(lon2 - lon1)
+    a = np.sin(dphi/2)**2 + np.cos(p1)*np.cos(p2)*np.sin(dl/2)**2
+    return 2*R*np.arcsin(np.sqrt(a))
+
 def _map_base(tiles_claros: bool):
     center = [-15.80, -47.90]
     tiles = "CartoDB positron" if tiles_claros else "OpenStreetMap"
@@ -72,14 +80,6 @@ def render_spatial_view(visitas: pd.DataFrame, dia_especifico, turno: str, nivel
         lat_c = ret["last_clicked"]["lat"]
         lon_c = ret["last_clicked"]["lng"]
 
-        def haversine(lat1, lon1, lat2, lon2):
-            R = 6371000.0
-            p1, p2 = np.radians(lat1), np.radians(lat2)
-            dphi = np.radians(lat2 - lat1)
-            dl   = np.radians(lon2 - lon1)
-            a = np.sin(dphi/2)**2 + np.cos(p1)*np.cos(p2)*np.sin(dl/2)**2
-            return 2*R*np.arcsin(np.sqrt(a))
-
         df_dia = df_dia.copy()
         df_dia["dist_m"] = haversine(lat_c, lon_c, df_dia["latitude"].values, df_dia["longitude"].values)
         nearest = df_dia.sort_values("dist_m").head(1)
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+import folium
+from streamlit_folium import st_folium
+from features.map_view import haversine, _map_base
+
+_SEG_TIME = np.frompyfunc(lambda t: t.hour * 3600 + t.minute * 60 + t.second, 1, 1)
+
+def _segundos_hora(hora: pd.Series) -> np.ndarray:
+    """Segundos do dia de 'hora' (timedelta, datetime ou datetime.time), NaN se ausente."""
+    if pd.api.types.is_timedelta64_dtype(hora):
+        return hora.dt.total_seconds().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(hora):
+        return (hora - hora.dt.normalize()).dt.total_seconds().to_numpy()
+    arr = hora.to_numpy(dtype=object)
+    ok = pd.notnull(arr)
+    seg = np.full(len(arr), np.nan)
+    if ok.any():
+        seg[ok] = _SEG_TIME(arr[ok]).astype(float)
+    return seg
+
+def _ordenar(visitas: pd.DataFrame):
+    """
+    Ordena as visitas por (ACS, dia, horário) com uma única chave int64 e
+    retorna (ordem, códigos ACS, nomes ACS, índice do dia, segundos, inícios dos grupos).
+    Visitas sem ACS ficam fora de `ordem`.
+    """
+    codigos, nomes = pd.factorize(visitas["ACS"], sort=True)
+    dia = visitas["data_visita"].values.astype("datetime64[D]").astype(np.int64)
+    base = dia * 86400
+    if "hora_seg" in visitas.columns:
+        seg = base + visitas["hora_seg"].to_numpy(dtype=float)
+    elif "hora" in visitas.columns:
+        seg = base + _segundos_hora(visitas["hora"])
+    else:
+        seg = visitas["data_visita"].values.astype("datetime64[s]").astype(np.int64).astype(float)
+
+    # horário ausente: visita fica no início do dia, sem intervalo calculado
+    seg_dia = np.nan_to_num(seg - base, nan=0.0).astype(np.int64)
+    dia_idx = dia - dia.min() if len(dia) else dia
+    ndias = int(dia_idx.max()) + 1 if len(dia) else 1
+    grupo = codigos.astype(np.int64) * ndias + dia_idx
+    chave = grupo * 86400 + seg_dia
+    bits = len(chave).bit_length()
+    if len(chave) and int(chave.max()) < (1 << (62 - bits)):
+        # posição nos bits baixos: chaves únicas, np.sort dá a ordem estável sem mergesort
+        ordem = np.sort((chave << bits) | np.arange(len(chave))) & ((1 << bits) - 1)
+    else:
+        ordem = np.argsort(chave, kind="stable")
+    ordem = ordem[codigos[ordem] >= 0]
+
+    grupo = grupo[ordem]
+    inicios = np.flatnonzero(np.r_[True, grupo[1:] != grupo[:-1]]) if len(grupo) else np.array([], dtype=np.int64)
+    return ordem, codigos[ordem], nomes, dia[ordem], seg[ordem], inicios
+
+def route_legs(visitas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Trechos entre visitas consecutivas do mesmo ACS no mesmo dia (visitas sem ACS
+    são descartadas). A primeira visita de cada ACS/dia fica com dist_m e intervalo_min nulos.
+    """
+    ordem, _, _, _, seg, inicios = _ordenar(visitas)
+    lat = visitas["latitude"].to_numpy(dtype=float)[ordem]
+    lon = visitas["longitude"].to_numpy(dtype=float)[ordem]
+
+    dist = np.empty(len(ordem))
+    dist[:1] = np.nan
+    dist[1:] = haversine(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    dist[inicios] = np.nan
+    gap = np.empty(len(ordem))
+    gap[:1] = np.nan
+    gap[1:] = np.diff(seg) / 60.0
+    gap[inicios] = np.nan
+
+    out = visitas.iloc[ordem].reset_index(drop=True)
+    out["dist_m"] = dist
+    out["intervalo_min"] = gap
+    return out
+
+def daily_metrics(visitas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Distância percorrida, janela ativa e visitas/hora por ACS e dia,
+    agregadas por offsets de grupo (sem laço por agente).
+    """
+    cols = ["ACS", "data", "visitas", "distancia_km", "inicio", "fim", "tempo_ativo_h", "visitas_por_hora"]
+    if visitas.empty:
+        return pd.DataFrame(columns=cols)
+
+    ordem, codigos, nomes, dia, seg, inicios = _ordenar(visitas)
+    if not len(ordem):
+        return pd.DataFrame(columns=cols)
+    lat = visitas["latitude"].to_numpy(dtype=float)[ordem]
+    lon = visitas["longitude"].to_numpy(dtype=float)[ordem]
+
+    dist = np.zeros(len(ordem))
+    dist[1:] = haversine(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    dist[inicios] = 0.0
+
+    n = np.diff(np.r_[inicios, len(ordem)])
+    km = np.add.reduceat(dist, inicios) / 1000.0
+    ini = np.fmin.reduceat(seg, inicios)
+    fim = np.fmax.reduceat(seg, inicios)
+    horas = (fim - ini) / 3600.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        por_hora = np.where(horas > 0, n / horas, np.nan)
+
+    return pd.DataFrame({
+        "ACS": nomes[codigos[inicios]],
+        "data": pd.to_datetime(dia[inicios], unit="D").date,
+        "visitas": n,
+        "distancia_km": km,
+        "inicio": pd.to_datetime(ini, unit="s"),
+        "fim": pd.to_datetime(fim, unit="s"),
+        "tempo_ativo_h": horas,
+        "visitas_por_hora": por_hora,
+    })[cols]
+
+def ranking_acs(diario: pd.DataFrame) -> pd.DataFrame:
+    cols = ["ACS", "dias", "visitas", "distancia_km", "km_por_dia", "tempo_ativo_h", "visitas_por_hora"]
+    if diario.empty:
+        return pd.DataFrame(columns=cols)
+    # visitas/hora só conta dias com janela ativa > 0 (dia de visita única não tem horas)
+    medido = diario["tempo_ativo_h"] > 0
+    out = diario.assign(visitas_medidas=diario["visitas"].where(medido, 0)).groupby("ACS").agg(
+        dias=("data", "size"), visitas=("visitas", "sum"), visitas_medidas=("visitas_medidas", "sum"),
+        distancia_km=("distancia_km", "sum"), tempo_ativo_h=("tempo_ativo_h", "sum")).reset_index()
+    out["km_por_dia"] = out["distancia_km"] / out["dias"]
+    horas = out["tempo_ativo_h"].where(out["tempo_ativo_h"] > 0)
+    out["visitas_por_hora"] = out["visitas_medidas"] / horas
+    return out[cols].sort_values(["visitas_por_hora", "visitas"], ascending=False).reset_index(drop=True)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _metricas_periodo(_visitas_periodo: pd.DataFrame, periodo, n_visitas: int):
+    # o frame (já em cache no loader) não entra no hash; a chave é o período + tamanho
+    diario = daily_metrics(_visitas_periodo)
+    return diario, ranking_acs(diario)
+
+def render_route_metrics(visitas_periodo: pd.DataFrame, periodo, tiles_claros: bool):
+    st.subheader("9.5 — Rotas e produtividade dos ACS")
+    df = visitas_periodo
+    if df.empty:
+        st.info("Sem dados no período.")
+        return
+
+    diario, ranking = _metricas_periodo(df, tuple(periodo), len(df))
+    st.markdown("**9.5.1 — Ranking de produtividade no período**")
+    st.dataframe(ranking.round(2), use_container_width=True)
+
+    st.markdown("**9.5.2 — Rota diária do ACS**")
+    c1, c2 = st.columns(2)
+    acs = c1.selectbox("ACS", sorted(diario["ACS"].unique()))
+    dias_acs = diario.loc[diario["ACS"] == acs, "data"].tolist()
+    dia = c2.selectbox("Dia da rota", dias_acs, index=len(dias_acs) - 1,
+                       format_func=lambda d: d.strftime("%d/%m/%Y"))
+
+    linha = diario[(diario["ACS"] == acs) & (diario["data"] == dia)].iloc[0]
+    k1, k2, k3 = st.columns(3)
+    k1.metric("Visitas", f"{linha['visitas']:,}".replace(",", "."))
+    k2.metric("Distância (km)", f"{linha['distancia_km']:.2f}")
+    k3.metric("Visitas/hora", f"{linha['visitas_por_hora']:.1f}" if pd.notnull(linha["visitas_por_hora"]) else "—")
+
+    rota = df[df["ACS"] == acs]
+    rota = route_legs(rota[rota["data"] == dia])
+    m = _map_base(tiles_claros)
+    pts = rota[["latitude", "longitude"]].values.tolist()
+    if len(pts) > 1:
+        folium.PolyLine(pts, color="#0066cc", weight=3, opacity=0.8).add_to(m)
+    for i, r in rota.iterrows():
+        hora_txt = r["hora"].strftime("%H:%M") if pd.notnull(r.get("hora", None)) else "—"
+        folium.CircleMarker(
+            location=[r["latitude"], r["longitude"]], radius=5, weight=1, fill=True,
+            popup=folium.Popup(f"<b>#{i + 1}</b> — {hora_txt}<br><b>UBS:</b> {r.get('UBS','')}", max_width=200),
+        ).add_to(m)
+    if pts:
+        m.fit_bounds(pts)
+    st_folium(m, width=None, height=480, key="map_rota")
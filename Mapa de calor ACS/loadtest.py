@@ -0,0 +1,368 @@
+# loadtest.py — Teste de carga do painel (sessões headless concorrentes via AppTest)
+#
+# Uso:
+#   python loadtest.py --sessoes 8 --passos 20 --linhas 500 50000 500000
+#
+# Cada tamanho de base roda em um processo separado (RSS e cache isolados). Dentro
+# do processo, as sessões rodam em threads, como no servidor do Streamlit, e
+# compartilham o st.cache_data — o mesmo que ocorre em um único container.
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import warnings
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CSV_PATH = os.path.join(BASE_DIR, "data", "visitas_acs.csv")
+CLICK_KEY = "_loadtest_click"
+
+# =========================
+# ======= DADOS ===========
+# =========================
+def gerar_base(linhas: int, destino: str, seed: int = 0):
+    """Reamostra o CSV original até `linhas` registros, com jitter espacial."""
+    df = pd.read_csv(CSV_PATH)
+    if linhas and linhas != len(df):
+        rng = np.random.default_rng(seed)
+        df = df.iloc[rng.integers(0, len(df), linhas)].reset_index(drop=True)
+        df["latitude"] = df["latitude"] + rng.normal(0, 0.002, len(df))
+        df["longitude"] = df["longitude"] + rng.normal(0, 0.002, len(df))
+    os.makedirs(os.path.join(destino, "data"), exist_ok=True)
+    df.to_csv(os.path.join(destino, "data", "visitas_acs.csv"), index=False)
+    return df
+
+def pontos_por_dia(visitas: pd.DataFrame) -> dict:
+    """
+    Coordenadas por (dia, turno) de um frame já normalizado pelo loader
+    (colunas 'data' e 'turno'); 'integral' no filtro do app mostra o dia inteiro.
+    """
+    out = {}
+    for dia, g in visitas.groupby("data"):
+        out[(dia, "integral")] = g[["latitude", "longitude"]].to_numpy()
+        for turno, gt in g[g["turno"] != "integral"].groupby("turno"):
+            out[(dia, turno)] = gt[["latitude", "longitude"]].to_numpy()
+    return out
+
+def preparar_app(linhas: int, destino: str) -> pd.DataFrame:
+    """
+    Copia o app para `destino` com uma base de `linhas` visitas e devolve a base
+    normalizada pelo loader do painel (aliases de coluna, formatos de hora, turno).
+    """
+    from core.data import load_visitas
+
+    shutil.copytree(BASE_DIR, destino, dirs_exist_ok=True,
+                    ignore=shutil.ignore_patterns("data", "*.csv", "*.zip", "tests", "__pycache__"))
+    gerar_base(linhas, destino)
+    visitas = load_visitas(os.path.join(destino, "data", "visitas_acs.csv"))
+    load_visitas.clear()  # não deixa a cópia em cache pesar no RSS medido
+    return visitas
+
+# =========================
+# ======= MEMÓRIA =========
+# =========================
+def rss_mb():
+    """RSS atual em MB; None onde não há /proc (macOS, Windows)."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def pico_rss_mb():
+    """Pico de RSS em MB; None sem o módulo `resource` (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return kb / 1024 / 1024 if sys.platform == "darwin" else kb / 1024
+
+def _arred(v, casas=1):
+    return round(v, casas) if v is not None else None
+
+# =========================
+# ======= STAND-IN ========
+# =========================
+def instalar_clique_stub():
+    """
+    O AppTest não interage com componentes customizados; o st_folium sempre
+    devolve o valor padrão. O stub renderiza o mapa normalmente e injeta em
+    `last_clicked` o clique guardado em session_state pelo roteiro.
+    """
+    import streamlit as st
+    import streamlit_folium
+
+    original = streamlit_folium.st_folium
+
+    def st_folium(fig, *args, **kwargs):
+        ret = original(fig, *args, **kwargs)
+        clique = st.session_state.get(CLICK_KEY)
+        if clique and kwargs.get("key") == "map_main":
+            ret = dict(ret or {}, last_clicked=clique)
+        return ret
+
+    streamlit_folium.st_folium = st_folium
+
+# =========================
+# ======= ROTEIROS ========
+# =========================
+def _por_label(widgets, label: str):
+    return next(w for w in widgets if w.label == label)
+
+def trocar_dia(at, rng, ctx):
+    w = at.sidebar.date_input[0]
+    w.set_value(w.min + timedelta(days=rng.randint(0, (w.max - w.min).days)))
+
+def trocar_turno(at, rng, ctx):
+    _por_label(at.sidebar.selectbox, "Turno").select(rng.choice(["integral", "manhã", "tarde"]))
+
+def mover_periodo(at, rng, ctx):
+    w = at.sidebar.slider[0]
+    ini, fim = ctx["data_min"], ctx["data_max"]
+    total = (fim - ini).days
+    a = rng.randint(0, total)
+    b = rng.randint(a, total)
+    w.set_value((ini + timedelta(days=a), ini + timedelta(days=b)))
+
+def clicar_mapa(at, rng, ctx):
+    # clica perto de uma visita do dia/turno exibido, como faria o usuário
+    dia = at.sidebar.date_input[0].value
+    turno = _por_label(at.sidebar.selectbox, "Turno").value
+    pontos = ctx["pontos_dia"].get((dia, turno))
+    if pontos is None:
+        pontos = ctx["pontos"]  # dia sem visitas: clique cai no vazio
+    lat, lon = pontos[rng.randrange(len(pontos))]
+    at.session_state[CLICK_KEY] = {"lat": float(lat) + rng.uniform(-5e-4, 5e-4),
+                                   "lng": float(lon) + rng.uniform(-5e-4, 5e-4)}
+
+def trocar_janela_alerta(at, rng, ctx):
+    _por_label(at.sidebar.selectbox, "Áreas sem visita nos últimos…").select(
+        rng.choice(["30 dias", "90 dias", "180 dias", "365 dias"]))
+
+ACOES = {
+    "dia": trocar_dia,
+    "turno": trocar_turno,
+    "periodo": mover_periodo,
+    "clique": clicar_mapa,
+    "alerta": trocar_janela_alerta,
+}
+
+# sequências típicas de uso; cada sessão sorteia roteiros até completar os passos
+ROTEIROS = [
+    ["dia", "turno", "clique", "turno", "clique"],
+    ["periodo", "periodo", "alerta", "dia"],
+    ["turno", "dia", "dia", "clique", "periodo"],
+    ["alerta", "alerta", "periodo", "clique"],
+]
+
+# =========================
+# ======= EXECUÇÃO ========
+# =========================
+def _sessao(idx, at, passos, pensar_s, ctx, barreira, amostras, lock):
+    rng = random.Random(idx)
+    try:
+        barreira.wait()
+    except threading.BrokenBarrierError:
+        pass  # alguma sessão não chegou a tempo; segue sem sincronizar a largada
+
+    def rodar(acao):
+        t0 = time.perf_counter()
+        erro = None
+        try:
+            at.run()
+            if len(at.exception):
+                erro = at.exception[0].message
+        except Exception as e:
+            erro = repr(e)
+        with lock:
+            amostras.append({"sessao": idx, "acao": acao, "ms": (time.perf_counter() - t0) * 1000, "erro": erro})
+
+    rodar("carga")
+    feitos = 0
+    while feitos < passos:
+        for nome in rng.choice(ROTEIROS):
+            if feitos >= passos:
+                break
+            if pensar_s:
+                time.sleep(rng.uniform(0, pensar_s))
+            try:
+                ACOES[nome](at, rng, ctx)
+            except Exception as e:
+                with lock:
+                    amostras.append({"sessao": idx, "acao": nome, "ms": 0.0, "erro": repr(e)})
+                feitos += 1
+                continue
+            rodar(nome)
+            feitos += 1
+
+def _percentis(ms) -> dict:
+    if not len(ms):
+        return {k: None for k in ["p50", "p90", "p95", "p99", "max"]}
+    p = np.percentile(ms, [50, 90, 95, 99, 100])
+    return dict(zip(["p50", "p90", "p95", "p99", "max"], np.round(p, 1).tolist()))
+
+def medir(linhas: int, n_sessoes: int, passos: int, pensar_s: float, timeout: float) -> dict:
+    # o relatório precisa ser legível/diffável: cala os avisos por rerun do Streamlit
+    # (ex.: deprecações) em todos os loggers streamlit.*. O nível vem da opção
+    # logger.level, reaplicada a cada parse da config, então é ela que se ajusta.
+    warnings.filterwarnings("ignore")
+    from streamlit import config
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+    config.set_option("logger.level", "error")
+    set_log_level("error")
+
+    destino = tempfile.mkdtemp(prefix="acs_loadtest_")
+    try:
+        base = preparar_app(linhas, destino)
+        app_path = os.path.join(destino, "app.py")
+        pontos = base[["latitude", "longitude"]].to_numpy()
+        ctx = {"pontos": pontos, "pontos_dia": pontos_por_dia(base),
+               "data_min": base["data"].min(), "data_max": base["data"].max()}
+        del base
+        instalar_clique_stub()
+        # sem /proc, as leituras intermediárias são o pico até aquele momento
+        rss_e_pico = rss_mb() is None
+        ler_rss = pico_rss_mb if rss_e_pico else rss_mb
+        rss_base = ler_rss()
+
+        # sessão de aquecimento: carrega o CSV no cache compartilhado
+        aquecimento = AppTest.from_file(app_path, default_timeout=timeout)
+        t0 = time.perf_counter()
+        aquecimento.run()
+        carga_fria_ms = (time.perf_counter() - t0) * 1000
+        rss_aquecido = ler_rss()
+
+        # sessões criadas antes das threads: falha aqui não deixa ninguém preso na barreira
+        # (a lista também mantém as sessões vivas para a medição de RSS)
+        sessoes = [AppTest.from_file(app_path, default_timeout=timeout) for _ in range(n_sessoes)]
+        amostras, lock = [], threading.Lock()
+        barreira = threading.Barrier(n_sessoes, timeout=timeout)
+        threads = [threading.Thread(target=_sessao, args=(i, at, passos, pensar_s, ctx,
+                                                          barreira, amostras, lock))
+                   for i, at in enumerate(sessoes)]
+        t0 = time.perf_counter()
+        for t in threads: t.start()
+        for t in threads: t.join()
+        duracao = time.perf_counter() - t0
+        rss_final = ler_rss()
+    finally:
+        shutil.rmtree(destino, ignore_errors=True)
+
+    df = pd.DataFrame(amostras)
+    ok = df[df["erro"].isna()]
+    por_acao = {a: _percentis(g["ms"].to_numpy()) for a, g in ok.groupby("acao")}
+    return {
+        "linhas": int(len(pontos)),
+        "sessoes": n_sessoes,
+        "reruns": int(len(ok)),
+        "erros": int(df["erro"].notna().sum()),
+        "exemplos_erro": df["erro"].dropna().unique().tolist()[:3],
+        "reruns_por_s": round(len(ok) / duracao, 2) if duracao else None,
+        "carga_fria_ms": round(carga_fria_ms, 1),
+        "latencia_ms": _percentis(ok.loc[ok["acao"] != "carga", "ms"].to_numpy()),
+        "latencia_por_acao_ms": por_acao,
+        "rss_e_pico": rss_e_pico,
+        "rss_base_mb": _arred(rss_base),
+        "rss_aquecido_mb": _arred(rss_aquecido),
+        "rss_final_mb": _arred(rss_final),
+        "rss_pico_mb": _arred(pico_rss_mb()),
+        "mb_por_sessao": (_arred((rss_final - rss_aquecido) / n_sessoes, 2)
+                          if rss_final is not None and rss_aquecido is not None else None),
+    }
+
+def _medir_em_processo(fila, linhas, *args):
+    try:
+        fila.put(medir(linhas, *args))
+    except Exception:
+        fila.put({"linhas": linhas, "erro_fatal": traceback.format_exc()})
+
+def _aguardar(p, fila, limite_s: float):
+    """Espera o resultado do processo filho sem travar se ele morrer ou estourar o limite."""
+    fim = time.monotonic() + limite_s
+    while time.monotonic() < fim:
+        try:
+            return fila.get(timeout=1)
+        except queue.Empty:
+            if not p.is_alive():
+                try:
+                    return fila.get(timeout=1)
+                except queue.Empty:
+                    return {"erro_fatal": f"processo terminou sem resultado (exitcode={p.exitcode})"}
+    p.terminate()
+    return {"erro_fatal": f"sem resultado após {limite_s:.0f} s; processo encerrado"}
+
+def _imprimir(r: dict):
+    if "erro_fatal" in r:
+        print(f"\n== {r['linhas']} visitas | FALHOU ==\n{r['erro_fatal']}")
+        return
+    lat = r["latencia_ms"]
+    print(f"\n== {r['linhas']:,} visitas | {r['sessoes']} sessões ==".replace(",", "."))
+    print(f"reruns: {r['reruns']} ({r['reruns_por_s']}/s) | erros: {r['erros']} | carga fria: {r['carga_fria_ms']} ms")
+    print(f"latência (ms)  p50 {lat['p50']}  p90 {lat['p90']}  p95 {lat['p95']}  p99 {lat['p99']}  máx {lat['max']}")
+    for acao, p in sorted(r["latencia_por_acao_ms"].items()):
+        print(f"  {acao:<8} p50 {p['p50']:>9}  p95 {p['p95']:>9}")
+    nd = lambda v: "n/d" if v is None else v
+    rotulo = "RSS pico acumulado (MB, sem /proc)" if r["rss_e_pico"] else "RSS (MB)"
+    print(f"{rotulo}  base {nd(r['rss_base_mb'])}  aquecido {nd(r['rss_aquecido_mb'])}  final {nd(r['rss_final_mb'])}"
+          f"  pico {nd(r['rss_pico_mb'])}  | por sessão ~{nd(r['mb_por_sessao'])}")
+    for e in r["exemplos_erro"]:
+        print(f"  erro: {e}")
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Teste de carga do painel ACS com sessões AppTest concorrentes.")
+    ap.add_argument("--sessoes", type=int, default=8, help="sessões simultâneas")
+    ap.add_argument("--passos", type=int, default=20, help="interações por sessão (além da carga inicial)")
+    ap.add_argument("--linhas", type=int, nargs="+", default=[0],
+                    help="tamanhos de base a testar (0 = CSV original)")
+    ap.add_argument("--pensar", type=float, default=0.0, help="pausa máxima entre interações (s)")
+    ap.add_argument("--timeout", type=float, default=120.0, help="timeout por rerun (s)")
+    ap.add_argument("--json", help="grava os resultados neste arquivo")
+    ap.add_argument("--max-p95", type=float, help="falha (exit 1) se o p95 de algum tamanho passar deste valor (ms)")
+    args = ap.parse_args(argv)
+    if any(n < 0 for n in args.linhas):
+        ap.error("--linhas não aceita valores negativos")
+    if args.sessoes < 1 or args.passos < 0:
+        ap.error("--sessoes deve ser ≥ 1 e --passos ≥ 0")
+
+    # cada rerun tem seu timeout; soma carga fria + passos, com folga para gerar a base
+    limite_s = args.timeout * (args.passos + 3) + 60
+    resultados = []
+    ctx = mp.get_context("spawn")
+    for linhas in args.linhas:
+        fila = ctx.Queue()
+        p = ctx.Process(target=_medir_em_processo,
+                        args=(fila, linhas, args.sessoes, args.passos, args.pensar, args.timeout))
+        p.start()
+        r = _aguardar(p, fila, limite_s)
+        r.setdefault("linhas", linhas)
+        p.join(timeout=10)
+        _imprimir(r)
+        resultados.append(r)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+    falhou = any("erro_fatal" in r or r["erros"] for r in resultados)
+    if args.max_p95 is not None:
+        falhou |= any((r["latencia_ms"]["p95"] or 0) > args.max_p95 for r in resultados if "erro_fatal" not in r)
+    return 1 if falhou else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
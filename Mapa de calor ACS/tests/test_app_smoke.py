@@ -0,0 +1,15 @@
+import os
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+def test_app_renderiza_rotas():
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    assert not at.exception
+    assert any(s.value.startswith("9.5") for s in at.subheader)
+
+    acs = next(w for w in at.selectbox if w.label == "ACS")
+    acs.select(acs.options[-1]).run()
+    assert not at.exception
+    assert any(m.label == "Distância (km)" for m in at.metric)
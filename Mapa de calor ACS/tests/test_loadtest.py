@@ -0,0 +1,60 @@
+import queue
+from datetime import date
+import pandas as pd
+import pytest
+import streamlit_folium
+import loadtest
+
+class _Processo:
+    def __init__(self, vivo: bool, exitcode=None):
+        self.vivo, self.exitcode, self.encerrado = vivo, exitcode, False
+    def is_alive(self):
+        return self.vivo
+    def terminate(self):
+        self.encerrado = True
+
+def test_pontos_por_dia_turnos():
+    visitas = pd.DataFrame({
+        "data": [date(2025, 7, 1)] * 3 + [date(2025, 7, 2)],
+        "turno": ["manhã", "tarde", "integral", "tarde"],
+        "latitude": [1.0, 2.0, 3.0, 4.0],
+        "longitude": [-1.0, -2.0, -3.0, -4.0],
+    })
+    pts = loadtest.pontos_por_dia(visitas)
+    assert pts[(date(2025, 7, 1), "integral")][:, 0].tolist() == [1.0, 2.0, 3.0]
+    assert pts[(date(2025, 7, 1), "manhã")].tolist() == [[1.0, -1.0]]
+    assert pts[(date(2025, 7, 1), "tarde")].tolist() == [[2.0, -2.0]]
+    assert (date(2025, 7, 2), "manhã") not in pts
+    assert len(pts[(date(2025, 7, 2), "integral")]) == 1
+
+def test_percentis():
+    assert loadtest._percentis([]) == {k: None for k in ["p50", "p90", "p95", "p99", "max"]}
+    p = loadtest._percentis([10.0, 20.0, 30.0])
+    assert p["p50"] == 20.0 and p["max"] == 30.0
+
+def test_aguardar_processo_sem_resultado():
+    r = loadtest._aguardar(_Processo(vivo=False, exitcode=3), queue.Queue(), 30)
+    assert "exitcode=3" in r["erro_fatal"]
+
+def test_aguardar_estouro_de_tempo():
+    p = _Processo(vivo=True)
+    r = loadtest._aguardar(p, queue.Queue(), 0.5)
+    assert p.encerrado and "sem resultado" in r["erro_fatal"]
+
+def test_aguardar_resultado():
+    fila = queue.Queue()
+    fila.put({"linhas": 1})
+    assert loadtest._aguardar(_Processo(vivo=True), fila, 5) == {"linhas": 1}
+
+@pytest.mark.parametrize("args", [["--linhas", "-5"], ["--sessoes", "0"], ["--passos", "-1"]])
+def test_main_valida_argumentos(args):
+    with pytest.raises(SystemExit) as exc:
+        loadtest.main(args)
+    assert exc.value.code == 2
+
+def test_medir_smoke(monkeypatch):
+    # medir instala o stub de clique; o monkeypatch restaura o st_folium original
+    monkeypatch.setattr(streamlit_folium, "st_folium", streamlit_folium.st_folium)
+    r = loadtest.medir(0, 1, 1, 0.0, 60)
+    assert r["erros"] == 0 and r["reruns"] == 2
+    assert r["latencia_ms"]["p50"] is not None
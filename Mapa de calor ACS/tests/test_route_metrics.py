@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+from datetime import time
+from features.route_metrics import route_legs, daily_metrics, ranking_acs
+
+def _visitas():
+    df = pd.DataFrame({
+        "data_visita": pd.to_datetime(["2025-07-01", "2025-07-01", "2025-07-01", "2025-07-02", "2025-07-01"]),
+        "hora": [time(10, 0), time(8, 0), time(9, 0), time(8, 0), time(8, 0)],
+        "latitude": [-15.80, -15.80, -15.81, -15.90, -15.70],
+        "longitude": [-47.92, -47.90, -47.90, -47.90, -47.80],
+        "ACS": ["Maria", "Maria", "Maria", "Maria", "Carlos"],
+        "UBS": ["UBS A"] * 5,
+    })
+    df["data"] = df["data_visita"].dt.date
+    df["hora_seg"] = [h.hour * 3600 + h.minute * 60 for h in df["hora"]]
+    return df
+
+def test_route_legs_por_acs_e_dia():
+    legs = route_legs(_visitas())
+    maria = legs[(legs["ACS"] == "Maria") & (legs["data"] == pd.Timestamp("2025-07-01").date())]
+    assert [h.hour for h in maria["hora"]] == [8, 9, 10]
+    assert np.isnan(maria["dist_m"].iloc[0]) and np.isnan(maria["intervalo_min"].iloc[0])
+    assert maria["intervalo_min"].iloc[1:].tolist() == [60.0, 60.0]
+    assert legs.loc[legs["ACS"] == "Carlos", "dist_m"].isna().all()
+
+def test_daily_metrics_e_ranking():
+    diario = daily_metrics(_visitas())
+    assert len(diario) == 3
+    d = diario[(diario["ACS"] == "Maria") & (diario["data"] == pd.Timestamp("2025-07-01").date())].iloc[0]
+    assert d["visitas"] == 3 and d["tempo_ativo_h"] == 2.0 and d["visitas_por_hora"] == 1.5
+    assert 3.4 < d["distancia_km"] < 3.6
+    assert diario["visitas_por_hora"].isna().sum() == 2
+
+    rank = ranking_acs(diario)
+    assert rank.iloc[0]["ACS"] == "Maria" and rank.iloc[0]["dias"] == 2
+    assert rank.iloc[0]["visitas"] == 4 and rank.iloc[0]["visitas_por_hora"] == 1.5
+    assert np.isnan(rank.iloc[1]["visitas_por_hora"])
+
+def test_daily_metrics_vazio():
+    assert daily_metrics(_visitas().head(0)).empty
+
+def test_visitas_sem_acs_descartadas():
+    df = _visitas().head(3)
+    df["ACS"] = ["A", None, "B"]
+    diario = daily_metrics(df)
+    assert sorted(diario["ACS"]) == ["A", "B"]
+    assert diario["visitas"].tolist() == [1, 1]
+    legs = route_legs(df)
+    assert len(legs) == 2 and legs["ACS"].notna().all()
+    assert daily_metrics(df.assign(ACS=None)).empty
+
+def test_fallback_sem_hora_seg():
+    df = _visitas()
+    df.loc[2, "hora"] = None
+    esperado = daily_metrics(df.assign(hora_seg=df["hora_seg"].where(df["hora"].notna())))
+    pd.testing.assert_frame_equal(daily_metrics(df.drop(columns="hora_seg")), esperado)
+    hora_td = pd.to_timedelta(df["hora_seg"].where(df["hora"].notna()), unit="s")
+    pd.testing.assert_frame_equal(daily_metrics(df.drop(columns="hora_seg").assign(hora=hora_td)), esperado)
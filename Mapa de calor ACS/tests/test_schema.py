@@ -1,4 +1,6 @@
+import warnings
 import pandas as pd
+from core.data import load_visitas
 
 def test_required_columns_present():
     required = {"data_visita","latitude","longitude","UBS","ACS"}
@@ -6,3 +8,15 @@ def test_required_columns_present():
     df = pd.DataFrame(columns=list(required))
     assert required.issubset(set(df.columns))
 
+def test_load_visitas_hora_visita(tmp_path):
+    csv = tmp_path / "visitas.csv"
+    csv.write_text("data_visita,hora_visita,latitude,longitude,ACS,UBS\n"
+                   "2025-07-01,11:00:00,-15.8,-47.8,Maria,UBS C\n"
+                   "2025-07-01,15:30,-15.9,-47.9,Carlos,UBS A\n"
+                   "2025-07-01,,-15.9,-47.9,Carlos,UBS A\n")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", UserWarning)
+        df = load_visitas(str(csv))
+    assert df["hora_seg"].tolist()[:2] == [39600.0, 55800.0]
+    assert pd.isna(df["hora_seg"].iloc[2]) and pd.isna(df["hora"].iloc[2])
+    assert df["turno"].tolist() == ["manhã", "tarde", "integral"]